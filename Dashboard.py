@@ -2,14 +2,9 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch
-import sympy as sp
-import math
+import io
+from kernels import M_RANGE, N_RANGE, moment_force, section_properties, stability_curve
 
 # Configuration de la page
 st.set_page_config(
@@ -20,7 +15,7 @@ st.set_page_config(
 )
 
 # CSS personnalisé
-st.markdown("""
+_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -55,6 +50,16 @@ st.markdown("""
         text-align: center;
         margin: 0.5rem 0;
     }
+    .verdict {
+        margin-top: 0.5rem;
+        padding: 0.4rem;
+        border-radius: 5px;
+        font-weight: bold;
+    }
+    .verdict-success { background-color: #d4edda; color: #155724; }
+    .verdict-info { background-color: #d1ecf1; color: #0c5460; }
+    .verdict-warning { background-color: #fff3cd; color: #856404; }
+    .verdict-error { background-color: #f8d7da; color: #721c24; }
     .formula-box {
         background-color: black;
         padding: 1rem;
@@ -64,11 +69,83 @@ st.markdown("""
         margin: 0.5rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Formules affichées, gardées en chaînes statiques : pas de rendu SymPy (sp.latex / lambdify)
+# dans la boucle Streamlit, lambdify remplissant linecache à chaque appel.
+# Si un affichage symbolique devient nécessaire, appeler linecache.clearcache() après lambdify.
+_FORMULA_MOMENT = '<div class="formula-box">M = F × d × sin(θ)</div>'
+_FORMULA_CONTRAINTE = '<div class="formula-box">σ = M / (I/v)</div>'
+_FORMULA_FLECHE_PONCTUELLE = '<div class="formula-box">f = (P × L³) / (48 × E × I)</div>'
+_FORMULA_FLECHE_REPARTIE = '<div class="formula-box">f = (5 × q × L⁴) / (384 × E × I)</div>'
+_FORMULA_INERTIE_RECT = '<div class="formula-box">I = (b × h³) / 12</div>'
+_FORMULA_MODULE_RECT = '<div class="formula-box">W = (b × h²) / 6</div>'
+
+@st.cache_data
+def _compute_moment_diagram(ponct, rep, x_max=10, n=None):
+    """Diagramme du moment fléchissant (kN.m) à partir des tableaux de forces"""
+    if n is None:
+        # Grille adaptée au nombre de forces : plus de points seulement si le diagramme se complexifie
+        n = 64 if len(ponct['distance']) + len(rep['debut']) < 8 else 128
+    x_points = np.linspace(0, x_max, n)
+    x = x_points[:, None]
+    
+    # Forces ponctuelles : moment ajouté au-delà du point d'application,
+    # sommes cumulées des moments triés par distance puis lecture par searchsorted
+    order = np.argsort(ponct['distance'], kind='stable')
+    cum_moment = np.concatenate([[0.0], np.cumsum(ponct['moment'][order] / 1000)])  # kN.m
+    idx = np.searchsorted(ponct['distance'][order], x_points, side='right')
+    moment_points = cum_moment[idx]
+    
+    # Charges réparties - calcul progressif sur la portée, puis moment équivalent
+    dx = x - rep['debut'][None, :]
+    in_span = (dx >= 0) & (x <= rep['fin'][None, :])
+    past = x > rep['fin'][None, :]
+    moment_points += np.where(in_span, rep['value'][None, :] * dx**2 / 2, 0.0).sum(axis=1)
+    moment_points += np.where(past, rep['moment_equiv'][None, :], 0.0).sum(axis=1)
+    
+    return x_points, moment_points
+
+@st.cache_data
+def _deformation_curve(x_max=10, n=32):
+    """Déformée sinusoïdale simulée (m)"""
+    x_def = np.linspace(0, x_max, n)
+    deformation = 0.01 * np.sin(np.pi * x_def / x_max)  # Forme sinusoïdale
+    return x_def, deformation
+
+@st.cache_data(max_entries=32)
+def _build_report(forces_key):
+    """Contenu du rapport, mis en cache tant que les forces saisies (forces_key) ne changent pas"""
+    # Simulation d'un rapport - en production utiliser reportlab
+    report_content = "Rapport PDF simulation - En production, utiliser reportlab pour generer un vrai PDF"
+    return report_content.encode('utf-8')
+
+def _render_result_box(metrics, verdict=None, level="success"):
+    """Affiche un bloc de résultats (métriques + verdict coloré selon level :
+    success, info, warning ou error) en un seul appel st.markdown"""
+    rows = "".join(
+        f'<div>{label} : <strong style="font-size: 1.4rem;">{value}</strong></div>'
+        for label, value in metrics
+    )
+    if verdict:
+        rows += f'<div class="verdict verdict-{level}">{verdict}</div>'
+    st.markdown(f'<div class="result-box">{rows}</div>', unsafe_allow_html=True)
 
 class MomentForceCalculator:
     def __init__(self):
-        self.forces = []
+        self.forces = []  # liste de dicts, conservée pour l'affichage
+        # Tableaux parallèles par type de force pour les calculs vectorisés
+        # 'position' : rang de la force dans self.forces (ordre de saisie)
+        self._ponct = {key: np.empty(0) for key in ('value', 'distance', 'angle', 'moment')}
+        self._ponct['position'] = np.empty(0, dtype=np.intp)
+        self._rep = {key: np.empty(0) for key in ('value', 'debut', 'fin', 'moment_equiv')}
+        self._rep['position'] = np.empty(0, dtype=np.intp)
+        # Totaux tenus à jour à chaque ajout de force (évite de reparcourir self.forces)
+        self._total_moment = 0.0        # N.m, toutes forces
+        self._total_force = 0.0         # N, toutes forces
+        self._total_load = 0.0          # somme des valeurs saisies
+        self._total_point_moment = 0.0  # N.m, forces ponctuelles
+        self._total_point_load = 0.0    # kN, forces ponctuelles
         self.materials = {
             "Béton C25/30": {"E": 30e9, "fc": 25e6, "weight": 2500},
             "Béton C30/37": {"E": 33e9, "fc": 30e6, "weight": 2500},
@@ -137,35 +214,53 @@ class MomentForceCalculator:
     
     def calculate_moment_force(self, force, distance, angle=90):
         """Calcule le moment d'une force par rapport à un point"""
-        # Conversion de l'angle en radians
-        angle_rad = math.radians(angle)
-        
-        # Composante perpendiculaire de la force
-        force_perp = force * math.sin(angle_rad)
+        # Moment = Force perpendiculaire × Distance
+        return moment_force(float(force), float(distance), float(angle))
+    
+    def add_force(self, force):
+        """Enregistre une force et met à jour les totaux"""
+        position = len(self.forces)
+        self.forces.append(force)
+        self._total_load += force['valeur']
+        if force['type'] == 'ponctuelle':
+            self._ponct['position'] = np.append(self._ponct['position'], position)
+            for key, field in (('value', 'valeur'), ('distance', 'distance'),
+                               ('angle', 'angle'), ('moment', 'moment')):
+                self._ponct[key] = np.append(self._ponct[key], force[field])
+            self._total_moment += force['moment']
+            self._total_force += force['force_perp']
+            self._total_point_moment += force['moment']
+            self._total_point_load += force['valeur']
+        else:
+            self._rep['position'] = np.append(self._rep['position'], position)
+            for key, field in (('value', 'valeur'), ('debut', 'debut'),
+                               ('fin', 'fin'), ('moment_equiv', 'moment_equiv')):
+                self._rep[key] = np.append(self._rep[key], force[field])
+            self._total_moment += force['moment_equiv'] * 1000  # Conversion en N.m
+            self._total_force += force['force_equiv'] * 1000   # Conversion en N
+    
+    def _forces_frames(self):
+        """DataFrames des forces ponctuelles et réparties, indexés par ordre de saisie"""
+        ponct_idx = [i for i, f in enumerate(self.forces) if f['type'] == 'ponctuelle']
+        rep_idx = [i for i, f in enumerate(self.forces) if f['type'] == 'répartie']
+        
+        df_ponct = pd.DataFrame.from_records(
+            [self.forces[i] for i in ponct_idx],
+            columns=['valeur', 'distance', 'angle', 'moment']
+        )
+        df_ponct.index = ponct_idx
         
-        # Moment = Force × Distance
-        moment = force_perp * distance
+        df_rep = pd.DataFrame.from_records(
+            [self.forces[i] for i in rep_idx],
+            columns=['valeur', 'debut', 'fin', 'longueur', 'moment_equiv']
+        )
+        df_rep.index = rep_idx
         
-        return moment, force_perp
+        return df_ponct, df_rep
     
     def calculate_section_properties(self, width, height, section_type="rectangulaire"):
         """Calcule les propriétés de la section"""
-        if section_type == "rectangulaire":
-            area = width * height
-            inertia = (width * height**3) / 12
-            module_inertie = inertia / (height / 2)
-        elif section_type == "circulaire":
-            diameter = width
-            area = (math.pi * diameter**2) / 4
-            inertia = (math.pi * diameter**4) / 64
-            module_inertie = inertia / (diameter / 2)
-        elif section_type == "en I":
-            # Simplifié pour l'exemple
-            area = width * height * 0.8
-            inertia = (width * height**3) / 12 * 0.7
-            module_inertie = inertia / (height / 2)
-        
-        return area, inertia, module_inertie
+        return section_properties(width, height, section_type)
     
     def create_force_input_section(self):
         """Section de saisie des forces"""
@@ -193,7 +288,7 @@ class MomentForceCalculator:
                 
                 if submitted and force_value > 0:
                     moment, force_perp = self.calculate_moment_force(force_value * 1000, distance, angle)
-                    self.forces.append({
+                    self.add_force({
                         'type': 'ponctuelle',
                         'valeur': force_value,
                         'distance': distance,
@@ -225,7 +320,7 @@ class MomentForceCalculator:
                     force_equiv = load_value * length
                     moment_equiv = force_equiv * (start_pos + length/2)
                     
-                    self.forces.append({
+                    self.add_force({
                         'type': 'répartie',
                         'valeur': load_value,
                         'debut': start_pos,
@@ -239,26 +334,25 @@ class MomentForceCalculator:
         # Affichage des forces enregistrées
         if self.forces:
             st.markdown("#### 📋 FORCES ENREGISTRÉES")
-            force_data = []
-            for i, force in enumerate(self.forces):
-                if force['type'] == 'ponctuelle':
-                    force_data.append({
-                        'Type': 'Ponctuelle',
-                        'Valeur (kN)': force['valeur'],
-                        'Distance (m)': force['distance'],
-                        'Angle (°)': force['angle'],
-                        'Moment (kN.m)': force['moment'] / 1000
-                    })
-                else:
-                    force_data.append({
-                        'Type': 'Répartie',
-                        'Valeur (kN/m)': force['valeur'],
-                        'Début-Fin (m)': f"{force['debut']}-{force['fin']}",
-                        'Longueur (m)': force['longueur'],
-                        'Moment équiv. (kN.m)': force['moment_equiv']
-                    })
-            
-            df_forces = pd.DataFrame(force_data)
+            df_ponct, df_rep = self._forces_frames()
+            df_ponct['moment'] /= 1000
+            df_ponct = df_ponct.rename(columns={
+                'valeur': 'Valeur (kN)',
+                'distance': 'Distance (m)',
+                'angle': 'Angle (°)',
+                'moment': 'Moment (kN.m)'
+            })
+            df_ponct.insert(0, 'Type', 'Ponctuelle')
+            
+            df_rep['Début-Fin (m)'] = df_rep['debut'].astype(str) + '-' + df_rep['fin'].astype(str)
+            df_rep = df_rep.rename(columns={
+                'valeur': 'Valeur (kN/m)',
+                'longueur': 'Longueur (m)',
+                'moment_equiv': 'Moment équiv. (kN.m)'
+            })[['Valeur (kN/m)', 'Début-Fin (m)', 'Longueur (m)', 'Moment équiv. (kN.m)']]
+            df_rep.insert(0, 'Type', 'Répartie')
+            
+            df_forces = pd.concat([df for df in (df_ponct, df_rep) if not df.empty]).sort_index()
             st.dataframe(df_forces, use_container_width=True)
     
     def create_moment_calculation_section(self):
@@ -276,22 +370,14 @@ class MomentForceCalculator:
             st.markdown('<div class="calculation-card">', unsafe_allow_html=True)
             st.subheader("📊 Calcul du moment total")
             
-            # Calcul du moment résultant
-            total_moment = 0
-            total_force = 0
+            # Moment résultant
+            total_moment = self._total_moment
+            total_force = self._total_force
             
-            for force in self.forces:
-                if force['type'] == 'ponctuelle':
-                    total_moment += force['moment']
-                    total_force += force['force_perp']
-                else:
-                    total_moment += force['moment_equiv'] * 1000  # Conversion en N.m
-                    total_force += force['force_equiv'] * 1000   # Conversion en N
-            
-            st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
-            st.metric("Moment total", f"{total_moment/1000:.2f} kN.m")
-            st.metric("Force résultante", f"{total_force/1000:.2f} kN")
-            st.markdown('</div>', unsafe_allow_html=True)
+            _render_result_box([
+                ("Moment total", f"{total_moment/1000:.2f} kN.m"),
+                ("Force résultante", f"{total_force/1000:.2f} kN")
+            ])
             
             st.markdown("</div>")
             
@@ -299,115 +385,112 @@ class MomentForceCalculator:
             st.markdown("#### 📈 Diagramme des moments")
             
             # Génération des points pour le diagramme
-            x_points = np.linspace(0, 10, 100)
-            moment_points = np.zeros_like(x_points)
+            x_points, moment_points = _compute_moment_diagram(self._ponct, self._rep)
             
-            for force in self.forces:
-                if force['type'] == 'ponctuelle':
-                    for i, x in enumerate(x_points):
-                        if x >= force['distance']:
-                            moment_points[i] += force['moment'] / 1000  # kN.m
-                else:
-                    for i, x in enumerate(x_points):
-                        if x >= force['debut']:
-                            if x <= force['fin']:
-                                # Charge répartie - calcul progressif
-                                moment_points[i] += force['valeur'] * (x - force['debut'])**2 / 2
-                            else:
-                                moment_points[i] += force['moment_equiv']
+            # Figure conservée entre les reruns : seules les données de la trace changent
+            if 'fig_moment' not in st.session_state:
+                fig_moment = go.Figure()
+                fig_moment.add_trace(go.Scattergl(
+                    x=[], y=[],
+                    mode='lines',
+                    name='Moment fléchissant',
+                    line=dict(color='#A23B72', width=3)
+                ))
+                fig_moment.update_layout(
+                    title="Diagramme du moment fléchissant",
+                    xaxis_title="Position (m)",
+                    yaxis_title="Moment (kN.m)",
+                    height=400
+                )
+                st.session_state['fig_moment'] = fig_moment
             
-            fig_moment = go.Figure()
-            fig_moment.add_trace(go.Scatter(
-                x=x_points, y=moment_points,
-                mode='lines',
-                name='Moment fléchissant',
-                line=dict(color='#A23B72', width=3)
-            ))
-            fig_moment.update_layout(
-                title="Diagramme du moment fléchissant",
-                xaxis_title="Position (m)",
-                yaxis_title="Moment (kN.m)",
-                height=400
-            )
+            fig_moment = st.session_state['fig_moment']
+            fig_moment.data[0].x = x_points
+            fig_moment.data[0].y = moment_points
             st.plotly_chart(fig_moment, use_container_width=True)
         
         with col2:
-            st.markdown('<div class="calculation-card">', unsafe_allow_html=True)
-            st.subheader("🔍 Analyse des contraintes")
-            
-            # Paramètres de la section
-            col_s1, col_s2 = st.columns(2)
-            with col_s1:
-                section_type = st.selectbox("Type de section:", 
-                                          ["rectangulaire", "circulaire", "en I"])
-                width = st.number_input("Largeur (m):", min_value=0.01, value=0.3, step=0.05)
-            
-            with col_s2:
-                height = st.number_input("Hauteur (m):", min_value=0.01, value=0.5, step=0.05)
-                material_props = st.selectbox("Matériau:", list(self.materials.keys()))
-            
-            # Calcul des propriétés
-            area, inertia, module_inertie = self.calculate_section_properties(width, height, section_type)
-            
-            # Contrainte maximale
-            if total_moment > 0:
-                contrainte_max = total_moment / module_inertie
-                
-                # Contrainte admissible
-                if "Acier" in material_props:
-                    contrainte_adm = self.materials[material_props]["fy"] / 1.15  # Coefficient sécurité acier
-                else:
-                    contrainte_adm = self.materials[material_props]["fc"] / 1.5   # Coefficient sécurité béton
-                
-                st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
-                st.metric("Contrainte max", f"{contrainte_max/1e6:.2f} MPa")
-                st.metric("Contrainte adm", f"{contrainte_adm/1e6:.2f} MPa")
-                
-                # Vérification
-                if contrainte_max <= contrainte_adm:
-                    st.success("✅ Section ADMISE")
-                else:
-                    st.error("❌ Section INSUFFISANTE")
-                st.markdown('</div>', unsafe_allow_html=True)
-            
-            st.markdown("</div>")
-            
-            # Visualisation de la section
-            st.markdown("#### 🏗️ Visualisation de la section")
-            
-            fig_section = go.Figure()
-            
-            if section_type == "rectangulaire":
-                fig_section.add_trace(go.Scatter(
-                    x=[0, width, width, 0, 0],
-                    y=[0, 0, height, height, 0],
-                    fill="toself",
-                    fillcolor='rgba(46, 134, 171, 0.6)',
-                    line=dict(color='#2E86AB', width=2),
-                    name="Section"
-                ))
-            elif section_type == "circulaire":
-                # Approximation avec un polygone
-                theta = np.linspace(0, 2*np.pi, 100)
-                x_circle = width/2 + (width/2) * np.cos(theta)
-                y_circle = height/2 + (height/2) * np.sin(theta)
-                
-                fig_section.add_trace(go.Scatter(
-                    x=x_circle, y=y_circle,
-                    fill="toself",
-                    fillcolor='rgba(162, 59, 114, 0.6)',
-                    line=dict(color='#A23B72', width=2),
-                    name="Section"
-                ))
-            
-            fig_section.update_layout(
-                title=f"Section {section_type}",
-                xaxis_title="Largeur (m)",
-                yaxis_title="Hauteur (m)",
-                yaxis=dict(scaleanchor="x", scaleratio=1),
-                height=300
-            )
-            st.plotly_chart(fig_section, use_container_width=True)
+            self.create_stress_analysis(total_moment)
+    
+    @st.fragment
+    def create_stress_analysis(self, total_moment):
+        """Analyse des contraintes (fragment : les widgets de section ne relancent que ce bloc)"""
+        st.markdown('<div class="calculation-card">', unsafe_allow_html=True)
+        st.subheader("🔍 Analyse des contraintes")
+        
+        # Paramètres de la section
+        col_s1, col_s2 = st.columns(2)
+        with col_s1:
+            section_type = st.selectbox("Type de section:", 
+                                      ["rectangulaire", "circulaire", "en I"])
+            width = st.number_input("Largeur (m):", min_value=0.01, value=0.3, step=0.05)
+        
+        with col_s2:
+            height = st.number_input("Hauteur (m):", min_value=0.01, value=0.5, step=0.05)
+            material_props = st.selectbox("Matériau:", list(self.materials.keys()))
+        
+        # Calcul des propriétés
+        area, inertia, module_inertie = self.calculate_section_properties(width, height, section_type)
+        
+        # Contrainte maximale
+        if total_moment > 0:
+            contrainte_max = total_moment / module_inertie
+        
+            # Contrainte admissible
+            if "Acier" in material_props:
+                contrainte_adm = self.materials[material_props]["fy"] / 1.15  # Coefficient sécurité acier
+            else:
+                contrainte_adm = self.materials[material_props]["fc"] / 1.5   # Coefficient sécurité béton
+        
+            # Vérification
+            if contrainte_max <= contrainte_adm:
+                verdict, level = "✅ Section ADMISE", "success"
+            else:
+                verdict, level = "❌ Section INSUFFISANTE", "error"
+        
+            _render_result_box([
+                ("Contrainte max", f"{contrainte_max/1e6:.2f} MPa"),
+                ("Contrainte adm", f"{contrainte_adm/1e6:.2f} MPa")
+            ], verdict, level)
+        
+        st.markdown("</div>")
+        
+        # Visualisation de la section
+        st.markdown("#### 🏗️ Visualisation de la section")
+        
+        fig_section = go.Figure()
+        
+        if section_type == "rectangulaire":
+            fig_section.add_trace(go.Scattergl(
+                x=[0, width, width, 0, 0],
+                y=[0, 0, height, height, 0],
+                fill="toself",
+                fillcolor='rgba(46, 134, 171, 0.6)',
+                line=dict(color='#2E86AB', width=2),
+                name="Section"
+            ))
+        elif section_type == "circulaire":
+            # Approximation avec un polygone
+            theta = np.linspace(0, 2*np.pi, 100)
+            x_circle = width/2 + (width/2) * np.cos(theta)
+            y_circle = height/2 + (height/2) * np.sin(theta)
+        
+            fig_section.add_trace(go.Scattergl(
+                x=x_circle, y=y_circle,
+                fill="toself",
+                fillcolor='rgba(162, 59, 114, 0.6)',
+                line=dict(color='#A23B72', width=2),
+                name="Section"
+            ))
+        
+        fig_section.update_layout(
+            title=f"Section {section_type}",
+            xaxis_title="Largeur (m)",
+            yaxis_title="Hauteur (m)",
+            yaxis=dict(scaleanchor="x", scaleratio=1),
+            height=300
+        )
+        st.plotly_chart(fig_section, use_container_width=True)
     
     def create_structural_analysis(self):
         """Analyse structurelle avancée"""
@@ -417,61 +500,105 @@ class MomentForceCalculator:
         tab1, tab2, tab3 = st.tabs(["Flèche et déformation", "Stabilité", "Interaction des efforts"])
         
         with tab1:
-            col1, col2 = st.columns(2)
+            self.create_deflection_analysis()
+        
+        with tab2:
+            self.create_stability_analysis()
+        
+        with tab3:
+            st.subheader("Interaction des efforts")
             
-            with col1:
-                st.subheader("Calcul de la flèche")
-                
-                # Paramètres pour le calcul de flèche
-                longueur_poutre = st.number_input("Longueur de la poutre (m):", 
-                                                min_value=1.0, value=6.0, step=0.5)
-                
-                material_def = st.selectbox("Matériau (déformation):", 
-                                          list(self.materials.keys()))
-                
-                E = self.materials[material_def]["E"]
-                
-                if self.forces and longueur_poutre > 0:
-                    # Calcul simplifié de la flèche maximale
-                    # Pour une charge ponctuelle au centre
-                    fleche_max = 0
-                    for force in self.forces:
-                        if force['type'] == 'ponctuelle':
-                            # Formule pour charge au centre: f = (P*L³)/(48*E*I)
-                            P = force['valeur'] * 1000  # N
-                            # Estimation de l'inertie
-                            I_est = 0.3 * 0.5**3 / 12  # Inertie estimée
-                            fleche_force = (P * longueur_poutre**3) / (48 * E * I_est)
-                            fleche_max += fleche_force
-                    
-                    fleche_adm = longueur_poutre / 500  # Flèche admissible
-                    
-                    st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
-                    st.metric("Flèche calculée", f"{fleche_max*1000:.2f} mm")
-                    st.metric("Flèche admissible", f"{fleche_adm*1000:.2f} mm")
-                    
-                    if fleche_max <= fleche_adm:
-                        st.success("✅ Flèche ADMISE")
-                    else:
-                        st.warning("⚠️ Flèche EXCESSIVE")
-                    st.markdown('</div>', unsafe_allow_html=True)
+            # Diagramme d'interaction M-N
+            if 'fig_interaction' not in st.session_state:
+                fig_interaction = go.Figure()
+                fig_interaction.add_trace(go.Scattergl(
+                    x=M_RANGE, y=N_RANGE,
+                    mode='lines',
+                    name='Courbe d\'interaction',
+                    line=dict(color='#2E86AB', width=3),
+                    fill='toself',
+                    fillcolor='rgba(46, 134, 171, 0.2)'
+                ))
+                fig_interaction.add_trace(go.Scattergl(
+                    x=[], y=[],
+                    mode='markers',
+                    name='Point de calcul',
+                    marker=dict(color='red', size=10)
+                ))
+                fig_interaction.update_layout(
+                    title="Diagramme d'interaction Moment-Effort normal",
+                    xaxis_title="Moment (kN.m)",
+                    yaxis_title="Effort normal (kN)",
+                    height=400
+                )
+                st.session_state['fig_interaction'] = fig_interaction
             
-            with col2:
-                st.subheader("Diagramme de déformation")
-                
-                # Simulation de la déformée
-                x_def = np.linspace(0, 10, 50)
-                deformation = 0.01 * np.sin(np.pi * x_def / 10)  # Forme sinusoïdale
-                
+            fig_interaction = st.session_state['fig_interaction']
+            
+            # Point de calcul actuel
+            if self.forces:
+                M_calc = self._total_point_moment / 1000  # kN.m
+                N_calc = 200  # Estimation d'effort normal
+                fig_interaction.data[1].x = [M_calc]
+                fig_interaction.data[1].y = [N_calc]
+            fig_interaction.data[1].visible = bool(self.forces)
+            
+            st.plotly_chart(fig_interaction, use_container_width=True)
+    
+    @st.fragment
+    def create_deflection_analysis(self):
+        """Calcul de la flèche et diagramme de déformation"""
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Calcul de la flèche")
+        
+            # Paramètres pour le calcul de flèche
+            longueur_poutre = st.number_input("Longueur de la poutre (m):", 
+                                            min_value=1.0, value=6.0, step=0.5)
+        
+            material_def = st.selectbox("Matériau (déformation):", 
+                                      list(self.materials.keys()))
+        
+            E = self.materials[material_def]["E"]
+        
+            if self.forces and longueur_poutre > 0:
+                # Calcul simplifié de la flèche maximale
+                # Pour une charge ponctuelle au centre
+                # Formule pour charge au centre: f = (P*L³)/(48*E*I), sommée sur les forces
+                P = self._total_point_load * 1000  # N
+                # Estimation de l'inertie
+                I_est = 0.3 * 0.5**3 / 12  # Inertie estimée
+                fleche_max = (P * longueur_poutre**3) / (48 * E * I_est)
+        
+                fleche_adm = longueur_poutre / 500  # Flèche admissible
+        
+                if fleche_max <= fleche_adm:
+                    verdict, level = "✅ Flèche ADMISE", "success"
+                else:
+                    verdict, level = "⚠️ Flèche EXCESSIVE", "warning"
+        
+                _render_result_box([
+                    ("Flèche calculée", f"{fleche_max*1000:.2f} mm"),
+                    ("Flèche admissible", f"{fleche_adm*1000:.2f} mm")
+                ], verdict, level)
+        
+        with col2:
+            st.subheader("Diagramme de déformation")
+        
+            # Simulation de la déformée
+            x_def, deformation = _deformation_curve()
+        
+            if 'fig_def' not in st.session_state:
                 fig_def = go.Figure()
-                fig_def.add_trace(go.Scatter(
-                    x=x_def, y=deformation*1000,  # en mm
+                fig_def.add_trace(go.Scattergl(
+                    x=[], y=[],
                     mode='lines',
                     name='Déformée',
                     line=dict(color='#F18F01', width=3)
                 ))
-                fig_def.add_trace(go.Scatter(
-                    x=x_def, y=np.zeros_like(x_def),
+                fig_def.add_trace(go.Scattergl(
+                    x=[], y=[],
                     mode='lines',
                     name='Position initiale',
                     line=dict(color='#2E86AB', width=2, dash='dash')
@@ -482,43 +609,52 @@ class MomentForceCalculator:
                     yaxis_title="Déformation (mm)",
                     height=400
                 )
-                st.plotly_chart(fig_def, use_container_width=True)
+                st.session_state['fig_def'] = fig_def
+        
+            fig_def = st.session_state['fig_def']
+            fig_def.data[0].x = x_def
+            fig_def.data[0].y = deformation*1000  # en mm
+            fig_def.data[1].x = x_def
+            fig_def.data[1].y = np.zeros_like(x_def)
+            st.plotly_chart(fig_def, use_container_width=True)
+    
+    @st.fragment
+    def create_stability_analysis(self):
+        """Analyse de stabilité et courbe charge-déformation"""
+        st.subheader("Analyse de stabilité")
         
-        with tab2:
-            st.subheader("Analyse de stabilité")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Calcul du coefficient de sécurité
-                charge_ultime = st.number_input("Charge ultime (kN):", 
-                                              min_value=0.0, value=50.0, step=5.0)
-                
-                if self.forces:
-                    charge_appliquee = sum([f['valeur'] for f in self.forces])
-                    coeff_securite = charge_ultime / charge_appliquee if charge_appliquee > 0 else float('inf')
-                    
-                    st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
-                    st.metric("Coefficient de sécurité", f"{coeff_securite:.2f}")
-                    
-                    if coeff_securite >= 2.0:
-                        st.success("✅ STABILITÉ EXCELLENTE")
-                    elif coeff_securite >= 1.5:
-                        st.info("🔶 STABILITÉ BONNE")
-                    else:
-                        st.error("🔴 STABILITÉ INSUFFISANTE")
-                    st.markdown('</div>', unsafe_allow_html=True)
-            
-            with col2:
-                st.subheader("Mode de déversement")
-                
-                # Graphique de stabilité
-                charge_range = np.linspace(0, charge_ultime, 50)
-                deformation_range = 0.1 * (charge_range / charge_ultime)**2
-                
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Calcul du coefficient de sécurité
+            charge_ultime = st.number_input("Charge ultime (kN):", 
+                                          min_value=0.0, value=50.0, step=5.0)
+        
+            if self.forces:
+                charge_appliquee = self._total_load
+                coeff_securite = charge_ultime / charge_appliquee if charge_appliquee > 0 else float('inf')
+        
+                if coeff_securite >= 2.0:
+                    verdict, level = "✅ STABILITÉ EXCELLENTE", "success"
+                elif coeff_securite >= 1.5:
+                    verdict, level = "🔶 STABILITÉ BONNE", "info"
+                else:
+                    verdict, level = "🔴 STABILITÉ INSUFFISANTE", "error"
+        
+                _render_result_box([
+                    ("Coefficient de sécurité", f"{coeff_securite:.2f}")
+                ], verdict, level)
+        
+        with col2:
+            st.subheader("Mode de déversement")
+        
+            # Graphique de stabilité
+            charge_range, deformation_range = stability_curve(charge_ultime)
+        
+            if 'fig_stability' not in st.session_state:
                 fig_stability = go.Figure()
-                fig_stability.add_trace(go.Scatter(
-                    x=deformation_range*1000, y=charge_range,
+                fig_stability.add_trace(go.Scattergl(
+                    x=[], y=[],
                     mode='lines',
                     name='Courbe charge-déformation',
                     line=dict(color='#A23B72', width=3)
@@ -529,44 +665,12 @@ class MomentForceCalculator:
                     yaxis_title="Charge (kN)",
                     height=300
                 )
-                st.plotly_chart(fig_stability, use_container_width=True)
+                st.session_state['fig_stability'] = fig_stability
         
-        with tab3:
-            st.subheader("Interaction des efforts")
-            
-            # Diagramme d'interaction M-N
-            N_range = np.linspace(-1000, 1000, 50)  # Effort normal
-            M_range = 500 * (1 - (N_range/1000)**2)  # Moment résistant
-            
-            fig_interaction = go.Figure()
-            fig_interaction.add_trace(go.Scatter(
-                x=M_range, y=N_range,
-                mode='lines',
-                name='Courbe d\'interaction',
-                line=dict(color='#2E86AB', width=3),
-                fill='toself',
-                fillcolor='rgba(46, 134, 171, 0.2)'
-            ))
-            
-            # Point de calcul actuel
-            if self.forces:
-                M_calc = sum([f.get('moment', 0) for f in self.forces]) / 1000  # kN.m
-                N_calc = 200  # Estimation d'effort normal
-                
-                fig_interaction.add_trace(go.Scatter(
-                    x=[M_calc], y=[N_calc],
-                    mode='markers',
-                    name='Point de calcul',
-                    marker=dict(color='red', size=10)
-                ))
-            
-            fig_interaction.update_layout(
-                title="Diagramme d'interaction Moment-Effort normal",
-                xaxis_title="Moment (kN.m)",
-                yaxis_title="Effort normal (kN)",
-                height=400
-            )
-            st.plotly_chart(fig_interaction, use_container_width=True)
+            fig_stability = st.session_state['fig_stability']
+            fig_stability.data[0].x = deformation_range*1000
+            fig_stability.data[0].y = charge_range
+            st.plotly_chart(fig_stability, use_container_width=True)
     
     def create_formulas_section(self):
         """Section des formules théoriques"""
@@ -577,7 +681,7 @@ class MomentForceCalculator:
         
         with col1:
             st.markdown("#### 🔧 Moments de forces")
-            st.markdown('<div class="formula-box">M = F × d × sin(θ)</div>', unsafe_allow_html=True)
+            st.markdown(_FORMULA_MOMENT, unsafe_allow_html=True)
             st.markdown("Où:")
             st.markdown("- **M** = Moment (N.m)")
             st.markdown("- **F** = Force (N)")
@@ -585,7 +689,7 @@ class MomentForceCalculator:
             st.markdown("- **θ** = Angle de la force (°)")
             
             st.markdown("#### 📐 Contrainte de flexion")
-            st.markdown('<div class="formula-box">σ = M / (I/v)</div>', unsafe_allow_html=True)
+            st.markdown(_FORMULA_CONTRAINTE, unsafe_allow_html=True)
             st.markdown("Où:")
             st.markdown("- **σ** = Contrainte (Pa)")
             st.markdown("- **M** = Moment (N.m)")
@@ -595,24 +699,55 @@ class MomentForceCalculator:
         with col2:
             st.markdown("#### 🏗️ Flèche des poutres")
             st.markdown("**Charge ponctuelle au centre:**")
-            st.markdown('<div class="formula-box">f = (P × L³) / (48 × E × I)</div>', unsafe_allow_html=True)
+            st.markdown(_FORMULA_FLECHE_PONCTUELLE, unsafe_allow_html=True)
             
             st.markdown("**Charge uniformément répartie:**")
-            st.markdown('<div class="formula-box">f = (5 × q × L⁴) / (384 × E × I)</div>', unsafe_allow_html=True)
+            st.markdown(_FORMULA_FLECHE_REPARTIE, unsafe_allow_html=True)
             
             st.markdown("#### 📊 Propriétés des sections")
             st.markdown("**Section rectangulaire:**")
-            st.markdown('<div class="formula-box">I = (b × h³) / 12</div>', unsafe_allow_html=True)
-            st.markdown('<div class="formula-box">W = (b × h²) / 6</div>', unsafe_allow_html=True)
+            st.markdown(_FORMULA_INERTIE_RECT, unsafe_allow_html=True)
+            st.markdown(_FORMULA_MODULE_RECT, unsafe_allow_html=True)
+    
+    def export_csv(self):
+        """Exporte les forces en CSV directement depuis les tableaux NumPy"""
+        ponct_rows = self._ponct['position']
+        rep_rows = self._rep['position']
+        
+        # Lignes placées selon l'ordre de saisie, comme le tableau affiché
+        table = np.full((len(ponct_rows) + len(rep_rows), 9), '', dtype=object)
+        table[ponct_rows, 0] = 'Ponctuelle'
+        table[ponct_rows, 1:5] = np.column_stack([
+            self._ponct['value'], self._ponct['distance'],
+            self._ponct['angle'], self._ponct['moment'] / 1000
+        ])
+        table[rep_rows, 0] = 'Répartie'
+        table[rep_rows, 5:9] = np.column_stack([
+            self._rep['value'], self._rep['debut'],
+            self._rep['fin'], self._rep['moment_equiv']
+        ])
+        
+        buf = io.StringIO()
+        np.savetxt(
+            buf, table, fmt='%s', delimiter=',', comments='',
+            header='Type,Valeur_kN,Distance_m,Angle_deg,Moment_kNm,'
+                   'Valeur_kN_m,Debut_m,Fin_m,Moment_equiv_kNm'
+        )
+        return buf.getvalue()
     
     def generate_report(self):
         """Génère un rapport PDF (version corrigée sans caractères non-ASCII)"""
-        # Simulation d'un rapport - en production utiliser reportlab
-        report_content = "Rapport PDF simulation - En production, utiliser reportlab pour generer un vrai PDF"
-        return report_content.encode('utf-8')
+        forces_key = tuple(
+            (f['type'], f.get('valeur'), f.get('distance'), f.get('angle'), f.get('debut'), f.get('fin'))
+            for f in self.forces
+        )
+        return _build_report(forces_key)
     
     def run_dashboard(self):
         """Exécute le dashboard complet"""
+        # CSS personnalisé
+        st.markdown(_CSS, unsafe_allow_html=True)
+        
         # Header
         self.display_header()
         
@@ -657,27 +792,7 @@ class MomentForceCalculator:
                 
                 with col2:
                     # Export des données
-                    force_data = []
-                    for i, force in enumerate(self.forces):
-                        if force['type'] == 'ponctuelle':
-                            force_data.append({
-                                'Type': 'Ponctuelle',
-                                'Valeur_kN': force['valeur'],
-                                'Distance_m': force['distance'],
-                                'Angle_deg': force['angle'],
-                                'Moment_kNm': force['moment'] / 1000
-                            })
-                        else:
-                            force_data.append({
-                                'Type': 'Répartie',
-                                'Valeur_kN_m': force['valeur'],
-                                'Debut_m': force['debut'],
-                                'Fin_m': force['fin'],
-                                'Moment_equiv_kNm': force['moment_equiv']
-                            })
-                    
-                    df_export = pd.DataFrame(force_data)
-                    csv_data = df_export.to_csv(index=False)
+                    csv_data = self.export_csv()
                     
                     st.download_button(
                         label="📊 Télécharger les données (CSV)",
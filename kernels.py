@@ -0,0 +1,74 @@
+# kernels.py
+# Noyaux de calcul purs du dashboard. Streamlit ré-exécute Dashboard.py à chaque rerun,
+# mais ce module importé n'est chargé qu'une fois par processus : les caches survivent.
+import math
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba optionnel : les noyaux restent en Python pur
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# sin(θ) précalculé pour les angles saisis par pas de 5° (0° à 180°)
+_SIN_TABLE = np.sin(np.deg2rad(np.arange(0, 181, 5)))
+
+@njit(cache=True)
+def moment_force(force, distance, angle_deg):
+    """Moment et composante perpendiculaire d'une force"""
+    idx = int(round(angle_deg / 5))
+    if 0 <= idx <= 36 and idx * 5 == angle_deg:
+        sin_angle = _SIN_TABLE[idx]
+    else:
+        sin_angle = math.sin(math.radians(angle_deg))
+    force_perp = force * sin_angle
+    return force_perp * distance, force_perp
+
+@njit(cache=True)
+def _section_rect(width, height):
+    area = width * height
+    inertia = (width * height**3) / 12
+    module_inertie = inertia / (height / 2)
+    return area, inertia, module_inertie
+
+@njit(cache=True)
+def _section_circ(width, height):
+    diameter = width
+    area = (math.pi * diameter**2) / 4
+    inertia = (math.pi * diameter**4) / 64
+    module_inertie = inertia / (diameter / 2)
+    return area, inertia, module_inertie
+
+@njit(cache=True)
+def _section_i(width, height):
+    # Simplifié pour l'exemple
+    area = width * height * 0.8
+    inertia = (width * height**3) / 12 * 0.7
+    module_inertie = inertia / (height / 2)
+    return area, inertia, module_inertie
+
+_SECTION_FUNCS = {
+    "rectangulaire": _section_rect,
+    "circulaire": _section_circ,
+    "en I": _section_i
+}
+
+@lru_cache(maxsize=128)
+def section_properties(width, height, section_type="rectangulaire"):
+    """Propriétés de section mémorisées pour toute la durée du processus"""
+    return _SECTION_FUNCS[section_type](width, height)
+
+@lru_cache(maxsize=32)
+def stability_curve(charge_ultime, n=50):
+    """Courbe charge-déformation jusqu'à la charge ultime (tableaux partagés, en lecture seule)"""
+    charge_range = np.linspace(0, charge_ultime, n)
+    deformation_range = 0.1 * (charge_range / charge_ultime)**2
+    charge_range.flags.writeable = False
+    deformation_range.flags.writeable = False
+    return charge_range, deformation_range
+
+# Courbe d'interaction M-N : indépendante des saisies, calculée une fois à l'import du module
+N_RANGE = np.linspace(-1000, 1000, 50)  # Effort normal
+M_RANGE = 500 * (1 - (N_RANGE/1000)**2)  # Moment résistant